@@ -0,0 +1,100 @@
+"""
+Micro-benchmark for filling paragraphs that hold many placeholders.
+
+Compares apply_fills_to_document (one run-preserving pass per paragraph) with
+the per-fill engine it replaced, which re-joined the paragraph text, replaced
+the first occurrence and moved the whole paragraph into its first run for every
+fill. Paragraphs come from sample_documents.write_fill_heavy: each placeholder
+is split across a bold and an italic run. Besides the timings, each engine's
+output is checked for the expected text and for the bold runs (with text) it
+kept.
+
+Usage (from Main-backend/):
+    python benchmarks/bench_fill.py
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from docx import Document
+
+import stub_llm
+from sample_documents import write_fill_heavy
+
+
+def per_fill_engine(doc, filled_placeholders):
+    """The replaced engine: a full re-join and rewrite of the paragraph per fill"""
+    fills_by_paragraph = {}
+    for placeholder in filled_placeholders:
+        fills_by_paragraph.setdefault(placeholder['paragraph_index'], []).append(placeholder)
+    for paragraph_index, fills in fills_by_paragraph.items():
+        paragraph = doc.paragraphs[paragraph_index]
+        fills.sort(key=lambda fill: fill.get('position_in_paragraph', 0), reverse=True)
+        for fill in fills:
+            runs = paragraph.runs
+            full_text = ''.join(run.text for run in runs)
+            if not runs or fill['match'] not in full_text:
+                continue
+            first_run_bold, first_run_italic = runs[0].bold, runs[0].italic
+            new_text = full_text.replace(fill['match'], fill['value'], 1)
+            for run in paragraph.runs:
+                run.text = ""
+            paragraph.runs[0].text = new_text
+            paragraph.runs[0].bold = first_run_bold
+            paragraph.runs[0].italic = first_run_italic
+
+
+def expected_text(paragraph_index: int, fills_per_paragraph: int) -> str:
+    return ''.join(f'Clause {j} text with Acme {paragraph_index * fills_per_paragraph + j} and more, '
+                   for j in range(fills_per_paragraph))
+
+
+def run(args):
+    main = stub_llm.import_main(tempfile.mkdtemp(prefix='bench_fill_'))
+    work_dir = tempfile.mkdtemp(prefix='bench_fill_docs_')
+    engines = {'per-fill': per_fill_engine, 'single-pass': main.apply_fills_to_document}
+
+    print(f"{'paragraphs x fills':>18} | {'per-fill ms':>11} | {'single-pass ms':>14} | speedup | "
+          f"correct (per-fill / single-pass) | bold runs kept (per-fill / single-pass)")
+    for paragraphs, fills_per_paragraph in args.shapes:
+        source = os.path.join(work_dir, f'{paragraphs}x{fills_per_paragraph}.docx')
+        write_fill_heavy(source, paragraphs, fills_per_paragraph)
+        with contextlib.redirect_stdout(io.StringIO()):
+            placeholders = main.generate_placeholder_metadata(source)['placeholders']
+        for i, placeholder in enumerate(placeholders):
+            placeholder.update(is_filled=True, value=f'Acme {i}')
+
+        timings, correct, bold_runs = {}, {}, {}
+        for name, engine in engines.items():
+            best = float('inf')
+            for _ in range(args.repeat):
+                doc = Document(source)
+                start = time.perf_counter()
+                engine(doc, [dict(placeholder) for placeholder in placeholders])
+                best = min(best, time.perf_counter() - start)
+            timings[name] = best
+            correct[name] = all(paragraph.text == expected_text(i, fills_per_paragraph)
+                                for i, paragraph in enumerate(doc.paragraphs))
+            bold_runs[name] = sum(1 for paragraph in doc.paragraphs for run in paragraph.runs
+                                  if run.bold and run.text)
+
+        print(f"{f'{paragraphs} x {fills_per_paragraph}':>18} | {timings['per-fill'] * 1000:11.0f} | "
+              f"{timings['single-pass'] * 1000:14.0f} | {timings['per-fill'] / timings['single-pass']:6.1f}x | "
+              f"{str(correct['per-fill']):>15} / {str(correct['single-pass']):<15} | "
+              f"{bold_runs['per-fill']} / {bold_runs['single-pass']}")
+
+
+def shape(value: str):
+    paragraphs, fills = value.split('x')
+    return int(paragraphs), int(fills)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--shapes', type=shape, nargs='+', default=[(50, 5), (50, 20), (50, 50), (20, 100)],
+                        help="Document shapes as PARAGRAPHSxFILLS, e.g. 50x20")
+    parser.add_argument('--repeat', type=int, default=1, help="Runs per engine; the best is reported")
+    run(parser.parse_args())
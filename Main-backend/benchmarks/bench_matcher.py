@@ -0,0 +1,126 @@
+"""
+Micro-benchmark for placeholder matching on a large corpus of paragraphs.
+
+Compares PlaceholderMatcher.finditer (trigger-character prefilter, one union
+regex, leftmost-longest overlap resolution) with the ordered alternation of the
+original patterns it replaced, on three corpora: paragraphs of generated
+contracts and the sample SAFE, plain prose without placeholders, and both
+mixed. The prefilter pays off on text without placeholders; on placeholder-dense
+paragraphs trying every pattern that can start at a match costs more than the
+first-alternative-wins regex. It also reports where the two disagree (the old
+alternation matched "[[Deep]" instead of "[[Deep]]", for example) and how long a
+tenant's custom matcher takes to build the first time and to look up afterwards.
+
+Usage (from Main-backend/):
+    python benchmarks/bench_matcher.py
+"""
+import argparse
+import glob
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from document_scanner import get_placeholder_matcher, parse_document, placeholder_matcher
+from sample_documents import write_contract
+
+# The original pattern list, first alternative wins
+ORDERED_PATTERNS = [
+    r"\[[^\]]+\]",
+    r"\[\[[^\]]+\]\]",
+    r"<[^>]+>",
+    r"\{[^}]+\}",
+    r"_{3,}",
+    r"\b[A-Z]+(?:_[A-Z]+)+\b",
+    r"\$\{[^}]+\}",
+    r"%[A-Za-z_]+%",
+    r"\$[A-Z_]+\$",
+    r"\[[A-Z]{2,}\]",
+]
+ordered_alternation = re.compile('|'.join(ORDERED_PATTERNS))
+
+PROSE_WORDS = ("the company shall pay investor amount under this agreement and any such terms "
+               "of conversion valuation").split()
+
+
+def build_corpora(contract_paragraphs: int, prose_paragraphs: int) -> dict:
+    work_dir = tempfile.mkdtemp(prefix='bench_matcher_')
+    paths = sorted(glob.glob(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                          'document_storage', '*_original.docx')))[:1]
+    for seed in range(4):
+        path = os.path.join(work_dir, f'contract_{seed}.docx')
+        write_contract(path, contract_paragraphs, seed=seed)
+        paths.append(path)
+
+    documents = []
+    for path in paths:
+        parsed = parse_document(path)
+        documents += [paragraph['text'] for paragraph in parsed['paragraphs']]
+        documents += [cell_paragraph.text for table in parsed['tables'] for row in table.rows
+                      for cell in row.cells for cell_paragraph in cell.paragraphs]
+
+    rng = random.Random(1)
+    prose = [' '.join(rng.choice(PROSE_WORDS) for _ in range(60)) + '.' for _ in range(prose_paragraphs)]
+    return {'documents': documents, 'plain prose': prose, 'mixed': documents + prose}
+
+
+def best_time(finditer, corpus, repeat: int):
+    best, matches = float('inf'), 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        matches = sum(1 for text in corpus for _ in finditer(text))
+        best = min(best, time.perf_counter() - start)
+    return best, matches
+
+
+def run(args):
+    corpora = build_corpora(args.contract_paragraphs, args.prose_paragraphs)
+    print(f"Trigger characters: {placeholder_matcher.triggers!r}")
+    print(f"{'corpus':>11} | {'paragraphs':>10} | {'MB':>5} | {'ordered ms':>10} | {'matcher ms':>10} | "
+          f"speedup | matches (ordered / matcher)")
+    for name, corpus in corpora.items():
+        megabytes = sum(map(len, corpus)) / 1e6
+        ordered_seconds, ordered_matches = best_time(ordered_alternation.finditer, corpus, args.repeat)
+        matcher_seconds, matcher_matches = best_time(placeholder_matcher.finditer, corpus, args.repeat)
+        print(f"{name:>11} | {len(corpus):10d} | {megabytes:5.1f} | {ordered_seconds * 1000:10.0f} | "
+              f"{matcher_seconds * 1000:10.0f} | {ordered_seconds / matcher_seconds:6.1f}x | "
+              f"{ordered_matches} / {matcher_matches}")
+
+    disagreements = Counter()
+    for text in corpora['documents']:
+        ordered = tuple(match.group() for match in ordered_alternation.finditer(text))
+        matched = tuple(match.group() for match in placeholder_matcher.finditer(text))
+        if ordered != matched:
+            disagreements[(ordered, matched)] += 1
+    print(f"Paragraphs where the two disagree: {sum(disagreements.values())}")
+    for (ordered, matched), count in disagreements.most_common(args.show_disagreements):
+        print(f"  {count:5d}x ordered {list(ordered)} -> matcher {list(matched)}")
+
+    # The first case-insensitive pattern in a process also builds the table of case variants
+    for label, tenant_patterns in [('tenant', [r'@@[A-Za-z_]+@@']),
+                                   ('first (?i) tenant', [r'(?i)\bacme_[a-z]+\b']),
+                                   ('next (?i) tenant', [r'(?i)\bbeta_[a-z]+\b'])]:
+        start = time.perf_counter()
+        get_placeholder_matcher(tenant_patterns)
+        compiled_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(1000):
+            get_placeholder_matcher(tenant_patterns)
+        cached_seconds = (time.perf_counter() - start) / 1000
+        print(f"{label:>17} matcher: {compiled_seconds * 1000:7.2f} ms to compile, "
+              f"{cached_seconds * 1e6:.2f} us per cached lookup")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--contract-paragraphs', type=int, default=4000,
+                        help="Paragraphs in each of the four generated contracts")
+    parser.add_argument('--prose-paragraphs', type=int, default=20000, help="Paragraphs of plain prose")
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per corpus; the best is reported")
+    parser.add_argument('--show-disagreements', type=int, default=10, help="Disagreement kinds to list")
+    run(parser.parse_args())
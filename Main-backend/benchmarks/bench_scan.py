@@ -0,0 +1,55 @@
+"""
+Benchmark for placeholder scanning as documents grow.
+
+Times collect_placeholder_metadata on generated contracts
+(sample_documents.write_contract) of increasing paragraph count. The scanner
+builds its paragraph index once per document and answers every per-match
+lookup from it, so the time per paragraph should stay flat: the last column is
+the time per paragraph relative to the smallest document.
+
+Usage (from Main-backend/):
+    python benchmarks/bench_scan.py --paragraphs 500 1000 2000 4000 8000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from document_scanner import collect_placeholder_metadata, parse_document
+from sample_documents import write_contract
+
+
+def best_time(func, *args, repeat: int):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run(args):
+    work_dir = tempfile.mkdtemp(prefix='bench_scan_')
+    print(f"{'paragraphs':>10} | {'placeholders':>12} | {'parse ms':>8} | {'scan ms':>8} | "
+          f"{'us/paragraph':>12} | vs smallest")
+    baseline = None
+    for paragraphs in args.paragraphs:
+        path = os.path.join(work_dir, f'contract_{paragraphs}.docx')
+        write_contract(path, paragraphs, seed=3, tables=False)
+        parse_seconds, _ = best_time(parse_document, path, repeat=args.repeat)
+        scan_seconds, metadata = best_time(collect_placeholder_metadata, path, repeat=args.repeat)
+        per_paragraph = scan_seconds / paragraphs
+        baseline = baseline or per_paragraph
+        print(f"{paragraphs:10d} | {len(metadata):12d} | {parse_seconds * 1000:8.1f} | {scan_seconds * 1000:8.1f} | "
+              f"{per_paragraph * 1e6:12.1f} | {per_paragraph / baseline:10.2f}x")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--paragraphs', type=int, nargs='+', default=[500, 1000, 2000, 4000, 8000],
+                        help="Document sizes to scan, in body paragraphs")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per size; the best is reported")
+    run(parser.parse_args())
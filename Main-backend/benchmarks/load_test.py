@@ -0,0 +1,117 @@
+"""
+Load test for the async request pipeline with a stub LLM.
+
+For each concurrency level N, uploads N documents at once, sends one chat turn
+to each at once, then downloads all N at once, through the ASGI app in a
+single process (one uvicorn worker's event loop). The stub LLM
+(benchmarks/stub_llm.py) waits --delay seconds per call, so with non-blocking
+handlers chat throughput grows with N until the CPU work of the turns (prompt
+building, metadata writes) saturates the process; large templates (see
+--paragraphs) get there sooner. The event-loop lag column is the worst delay a
+10 ms timer saw during the chat phase: docx work or LLM calls run on the loop
+would show up there.
+
+Usage (from Main-backend/):
+    python benchmarks/load_test.py --concurrency 1 8 32 64 128 --delay 0.2
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import stub_llm
+from sample_documents import write_contract
+
+
+async def timed(request):
+    start = time.perf_counter()
+    response = await request
+    return response, time.perf_counter() - start
+
+
+async def watch_event_loop(stop: asyncio.Event, interval: float = 0.01) -> float:
+    """Worst lateness of an interval timer until stop is set"""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+
+async def run_phase(requests) -> dict:
+    start = time.perf_counter()
+    results = await asyncio.gather(*[timed(request) for request in requests])
+    elapsed = time.perf_counter() - start
+    latencies = sorted(latency for _, latency in results)
+    return {
+        'responses': [response for response, _ in results],
+        'elapsed': elapsed,
+        'p50': statistics.median(latencies),
+        'p95': latencies[int(0.95 * (len(latencies) - 1))],
+    }
+
+
+async def run_level(main, template: str, concurrency: int) -> dict:
+    import httpx
+
+    with open(template, 'rb') as f:
+        upload_bytes = f.read()
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://load', timeout=600) as client:
+        uploads = await run_phase([
+            client.post('/upload-document', files={'file': ('template.docx', upload_bytes)})
+            for _ in range(concurrency)
+        ])
+        document_ids = [response.json()['document_id'] for response in uploads['responses']]
+
+        stop = asyncio.Event()
+        watcher = asyncio.create_task(watch_event_loop(stop))
+        chats = await run_phase([
+            client.post(f'/chat/{document_id}', json={'user_input': 'The company is TechStart Inc.'})
+            for document_id in document_ids
+        ])
+        stop.set()
+        loop_lag = await watcher
+
+        downloads = await run_phase([client.get(f'/download/{document_id}') for document_id in document_ids])
+
+    phases = {'upload': uploads, 'chat': chats, 'download': downloads}
+    statuses = {response.status_code for phase in phases.values() for response in phase['responses']}
+    return {'phases': phases, 'statuses': sorted(statuses), 'loop_lag': loop_lag}
+
+
+def main_cli(args):
+    storage_dir = tempfile.mkdtemp(prefix='load_test_')
+    main = stub_llm.import_main(storage_dir)
+    stub_llm.install(main, delay=args.delay)
+    template = os.path.join(storage_dir, 'template.docx')
+    write_contract(template, args.paragraphs)
+
+    print(f"Stub LLM delay {args.delay:.2f}s per call, {args.paragraphs}-paragraph template, "
+          f"DOCX_WORKER_THREADS={main.DOCX_WORKER_THREADS}")
+    print(f"{'N':>4} | {'phase':8} | {'wall s':>7} | {'req/s':>7} | {'p50 ms':>7} | {'p95 ms':>7} | "
+          f"{'loop lag ms':>11} | statuses")
+    for concurrency in args.concurrency:
+        with contextlib.redirect_stdout(io.StringIO()):
+            level = asyncio.run(run_level(main, template, concurrency))
+        for name, phase in level['phases'].items():
+            lag = f"{level['loop_lag'] * 1000:11.0f}" if name == 'chat' else ' ' * 11
+            print(f"{concurrency:4d} | {name:8} | {phase['elapsed']:7.2f} | {concurrency / phase['elapsed']:7.1f} | "
+                  f"{phase['p50'] * 1000:7.0f} | {phase['p95'] * 1000:7.0f} | {lag} | {level['statuses']}")
+        if level['statuses'] != [200]:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32, 64, 128],
+                        help="Concurrent requests per phase, one run per value")
+    parser.add_argument('--delay', type=float, default=0.2, help="Simulated seconds per LLM call")
+    parser.add_argument('--paragraphs', type=int, default=30, help="Paragraphs in the generated template")
+    main_cli(parser.parse_args())
@@ -0,0 +1,77 @@
+"""
+Generated sample documents for the benchmarks.
+
+The documents are built with python-docx from a fixed seed, so every run (and
+every machine) benchmarks the same input without binary fixtures in the repo.
+"""
+import random
+
+from docx import Document
+from docx.shared import Pt
+
+
+# One of each placeholder style the default matcher recognises
+PLACEHOLDER_STYLES = [
+    '[Company Name]', '[_____________]', '<Investor>', '{Amount}', '_____', 'DATE_OF_SAFE',
+    '${CAP}', '%DATE%', '$CLIENT_NAME$', '[FN]', '[[Deep]]',
+]
+CLAUSE_OPENINGS = ['This agreement is made. ', 'The parties agree! ', 'Whereas the ', 'pay ']
+CLAUSE_ENDINGS = [' and so on.', '', ' ', '. Next']
+
+
+def write_contract(path: str, paragraphs: int, seed: int = 0, tables: bool = True):
+    """
+    Write a contract-like document mixing every placeholder style.
+
+    Paragraphs have 0-6 runs with mixed styles, formatting and line breaks, some
+    empty paragraphs, and (with tables) three tables with a merged cell.
+
+    Args:
+        path: Output .docx path
+        paragraphs: Number of body paragraphs
+        seed: Random seed; the same seed always writes the same document
+        tables: Whether to append the tables
+    """
+    rng = random.Random(seed)
+    doc = Document()
+    for i in range(paragraphs):
+        paragraph = doc.add_paragraph(style=rng.choice(['Normal', 'Heading 1', 'List Bullet']))
+        for _ in range(rng.randint(0, 6)):
+            run = paragraph.add_run(rng.choice(CLAUSE_OPENINGS) + rng.choice(PLACEHOLDER_STYLES + ['', ''])
+                                    + rng.choice(CLAUSE_ENDINGS))
+            run.bold = rng.choice([True, None, False])
+            if rng.random() < 0.3:
+                run.font.size = Pt(11)
+                run.font.name = 'Arial'
+            if rng.random() < 0.2:
+                run.add_break()
+        if i % 7 == 0:
+            doc.add_paragraph('')
+    if tables:
+        for _ in range(3):
+            table = doc.add_table(rows=4, cols=3)
+            for row in table.rows:
+                for cell in row.cells:
+                    cell.text = rng.choice(['Name: [Company Name]', 'x', '', 'Amount ${CAP} and %DATE%. Sign _____'])
+                    cell.add_paragraph(rng.choice(['[FN] [LN]', '', 'ok']))
+            table.cell(0, 0).merge(table.cell(0, 1))
+    doc.save(path)
+
+
+def write_fill_heavy(path: str, paragraphs: int, fills_per_paragraph: int):
+    """
+    Write paragraphs that each hold many placeholders split across formatted runs.
+
+    Paragraph i reads "Clause j text with [Company Name j] and more, " for each
+    j < fills_per_paragraph, with "[Company" in a bold run and " Name j]" in an
+    italic one.
+    """
+    doc = Document()
+    for _ in range(paragraphs):
+        paragraph = doc.add_paragraph()
+        for j in range(fills_per_paragraph):
+            paragraph.add_run(f'Clause {j} text with ')
+            paragraph.add_run('[Company').bold = True
+            paragraph.add_run(f' Name {j}]').italic = True
+            paragraph.add_run(' and more, ')
+    doc.save(path)
@@ -0,0 +1,135 @@
+"""
+Stress test for concurrent /chat turns: no fill may be lost.
+
+Uploads a few documents, then fires hundreds of concurrent chat turns at them
+from one or more worker processes sharing the same storage, with a stub LLM
+(benchmarks/stub_llm.py) that fills the first two unfilled placeholders of
+each turn with a value unique to that turn. Every fill a response reports must
+still be on disk once all turns are done: a turn that overwrote another turn's
+metadata, or two turns filling the same placeholder, fails the run.
+
+Usage (from Main-backend/):
+    python benchmarks/stress_sessions.py --turns 300 --documents 4 --processes 2
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+import stub_llm
+
+# The user's reply as quoted in the fill prompts
+TURN_MARKER = re.compile(r'USER RESPONSE:\s*"(W\d+-TURN-\d+)"')
+
+
+async def upload_documents(main, count: int, paragraphs: int) -> list:
+    import httpx
+    from sample_documents import write_fill_heavy
+
+    template = os.path.join(main.STORAGE_DIR, 'template.docx')
+    write_fill_heavy(template, paragraphs, 5)
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://stress', timeout=600) as client:
+        document_ids = []
+        for _ in range(count):
+            with open(template, 'rb') as f:
+                response = await client.post('/upload-document', files={'file': ('template.docx', f.read())})
+            response.raise_for_status()
+            document_ids.append(response.json()['document_id'])
+    return document_ids
+
+
+async def fire_turns(main, document_ids: list, turns: int, worker: int) -> dict:
+    """Send all turns at once, round-robin over the documents"""
+    import httpx
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://stress', timeout=600) as client:
+        async def turn(n):
+            document_id = document_ids[n % len(document_ids)]
+            response = await client.post(f'/chat/{document_id}', json={'user_input': f'W{worker}-TURN-{n}'})
+            fills = response.json().get('fills', []) if response.status_code == 200 else []
+            return document_id, response.status_code, fills
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*[turn(n) for n in range(turns)])
+        elapsed = time.perf_counter() - start
+    return {
+        'elapsed': elapsed,
+        'statuses': sorted({status for _, status, _ in results}),
+        'reported': [(document_id, fill['placeholder_id'], fill['value'])
+                     for document_id, _, fills in results for fill in fills],
+    }
+
+
+def run_worker(args):
+    """Child process: fire this worker's turns and print the outcome as JSON"""
+    main = stub_llm.import_main(args.storage_dir)
+    marker = lambda prompt: TURN_MARKER.search(prompt).group(1)
+    stub_llm.install(main, delay=args.delay, fill_value=marker)
+    with contextlib.redirect_stdout(io.StringIO()):
+        outcome = asyncio.run(fire_turns(main, json.loads(args.document_ids), args.turns, args.worker))
+    print(json.dumps(outcome))
+
+
+def run(args) -> int:
+    storage_dir = tempfile.mkdtemp(prefix='stress_sessions_')
+    main = stub_llm.import_main(storage_dir)
+    stub_llm.install(main)
+    with contextlib.redirect_stdout(io.StringIO()):
+        document_ids = asyncio.run(upload_documents(main, args.documents, args.paragraphs))
+
+    workers = [
+        subprocess.Popen([sys.executable, os.path.abspath(__file__), '--worker', str(worker),
+                          '--storage-dir', storage_dir, '--document-ids', json.dumps(document_ids),
+                          '--turns', str(args.turns), '--delay', str(args.delay)],
+                         stdout=subprocess.PIPE, text=True)
+        for worker in range(args.processes)
+    ]
+    outcomes = [json.loads(worker.communicate()[0].strip().splitlines()[-1]) for worker in workers]
+
+    on_disk = {}
+    for document_id in document_ids:
+        metadata = main.load_metadata_file(main.get_document_paths(document_id)['metadata_path'])
+        for placeholder in metadata['placeholders']:
+            if placeholder['is_filled']:
+                on_disk[(document_id, placeholder['unique_id'])] = placeholder['value']
+    reported = [tuple(fill) for outcome in outcomes for fill in outcome['reported']]
+    lost = [fill for fill in reported if on_disk.get(fill[:2]) != fill[2]]
+    filled_twice = len(reported) - len({fill[:2] for fill in reported})
+    statuses = sorted({status for outcome in outcomes for status in outcome['statuses']})
+
+    print(f"{args.processes} process(es) x {args.turns} concurrent turns on {args.documents} documents "
+          f"in {max(outcome['elapsed'] for outcome in outcomes):.1f}s: statuses {statuses}, "
+          f"{len(reported)} fills reported, {len(on_disk)} filled on disk, "
+          f"filled by more than one turn: {filled_twice}, reported but lost: {len(lost)}")
+    if statuses != [200] or not reported or lost or filled_twice:
+        print("FAILED:", "no fills reported" if not reported else f"lost updates {lost[:5]}")
+        return 1
+    print("OK: no lost updates")
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--turns', type=int, default=300, help="Concurrent chat turns per process")
+    parser.add_argument('--documents', type=int, default=4, help="Documents the turns are spread over")
+    parser.add_argument('--processes', type=int, default=2, help="Worker processes sharing the storage")
+    parser.add_argument('--paragraphs', type=int, default=200,
+                        help="Paragraphs per document (5 placeholders each)")
+    parser.add_argument('--delay', type=float, default=0.02, help="Simulated seconds per LLM call")
+    parser.add_argument('--worker', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--storage-dir', help=argparse.SUPPRESS)
+    parser.add_argument('--document-ids', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker is not None:
+        run_worker(args)
+    else:
+        sys.exit(run(args))
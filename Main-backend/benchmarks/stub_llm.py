@@ -0,0 +1,111 @@
+"""
+Stub LLM for the benchmarks: answers every structured-output schema main.py
+asks for, after a fixed simulated latency, without any network access.
+
+import_main() imports main.py against a scratch storage directory and
+install(main) swaps the stub in for main.llm. The stub fills the first two
+placeholders listed in a fill prompt with fill_value(prompt) and asks about the
+next two, so chat turns make progress through a document the way a real model
+would.
+"""
+import asyncio
+import contextlib
+import io
+import os
+import re
+import sys
+import time
+from typing import Callable, List, Optional
+
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PLACEHOLDER_ID = re.compile(r'"unique_id":\s*"(PLACEHOLDER_\d+)"')
+
+
+class StubMessage:
+    def __init__(self, content: str):
+        self.content = content
+
+
+def listed_placeholder_ids(prompt: str) -> List[str]:
+    """unique_ids of the placeholder records in a prompt, in prompt order"""
+    return list(dict.fromkeys(PLACEHOLDER_ID.findall(prompt)))
+
+
+class StubLLM:
+    """
+    Drop-in for the ChatGoogleGenerativeAI client main.py uses.
+
+    Args:
+        delay: Simulated seconds per call
+        fill_value: Value given to each filled placeholder, from the prompt
+    """
+
+    model = "stub"
+
+    def __init__(self, delay: float = 0.0, fill_value: Optional[Callable[[str], str]] = None):
+        self.delay = delay
+        self.fill_value = fill_value or (lambda prompt: "TechStart Inc.")
+        self.calls = {}
+        self.schema = None
+
+    def with_structured_output(self, schema):
+        structured = StubLLM(self.delay, self.fill_value)
+        structured.calls = self.calls
+        structured.schema = schema
+        return structured
+
+    def respond(self, prompt: str):
+        name = self.schema.__name__ if self.schema else "text"
+        self.calls[name] = self.calls.get(name, 0) + 1
+        ids = listed_placeholder_ids(prompt)
+        if self.schema is None:
+            return StubMessage("What is the company name?\nTARGETS: " + ", ".join(ids[:2]))
+        fields = self.schema.model_fields
+        if "contexts" in fields:
+            return self.schema(contexts=[{'placeholder_id': i, 'llm_context': f"context for {i}"} for i in ids])
+        response = {}
+        if "fills" in fields:
+            value = self.fill_value(prompt)
+            response['fills'] = [{'placeholder_id': i, 'value': value, 'confidence': 'High', 'reasoning': "stub"}
+                                 for i in ids[:2]]
+            ids = ids[2:]
+        if "question" in fields:
+            response.update(question="What is the company name?" if ids else "", reasoning="stub")
+            if "target_placeholder_ids" in fields:
+                response['target_placeholder_ids'] = ids[:2]
+        return self.schema(**response)
+
+    def invoke(self, messages):
+        if self.delay:
+            time.sleep(self.delay)
+        return self.respond(messages[0]['content'])
+
+    async def ainvoke(self, messages):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return self.respond(messages[0]['content'])
+
+    async def astream(self, messages):
+        text = self.respond(messages[0]['content']).content
+        for start in range(0, len(text), 8):
+            if self.delay:
+                await asyncio.sleep(self.delay / 10)
+            yield StubMessage(text[start:start + 8])
+
+
+def install(main, delay: float = 0.0, fill_value: Optional[Callable[[str], str]] = None) -> StubLLM:
+    """Replace main.llm with a StubLLM and return it (its .calls counts calls per schema)"""
+    main.llm = StubLLM(delay, fill_value)
+    return main.llm
+
+
+def import_main(storage_dir: str):
+    """Import main.py with its registry, template cache and storage under storage_dir"""
+    os.environ['DOCUMENT_REGISTRY_PATH'] = os.path.join(storage_dir, 'registry.db')
+    os.environ['TEMPLATE_CACHE_DIR'] = os.path.join(storage_dir, 'template_cache')
+    with contextlib.redirect_stdout(io.StringIO()):
+        import main
+    main.STORAGE_DIR = storage_dir
+    return main
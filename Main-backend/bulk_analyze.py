@@ -0,0 +1,338 @@
+"""
+Bulk placeholder analysis for template libraries.
+
+Runs every .docx under the given directories (or listed in a manifest) through
+a process pool and writes one JSON record per template to sharded JSONL files:
+
+    python bulk_analyze.py templates/ --output-dir analysis/ --workers 8
+    python bulk_analyze.py --manifest paths.txt --output-dir analysis/
+
+Each record holds the template's placeholder metadata exactly as
+collect_placeholder_metadata returns it (no LLM contexts are generated). Runs are
+resumable: templates already recorded in the output directory with the same size
+and modification time are skipped, so an interrupted run is simply started again.
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from document_scanner import (
+    UPLOAD_MAX_BYTES,
+    collect_placeholder_metadata,
+    get_document_statistics,
+    get_placeholder_matcher,
+    scan_document,
+)
+
+
+# Records per output shard before a new shard file is started
+BULK_SHARD_RECORDS = int(os.environ.get("BULK_SHARD_RECORDS", 1000))
+# Templates a worker process analyzes before it is replaced, bounding its memory
+BULK_TASKS_PER_WORKER = int(os.environ.get("BULK_TASKS_PER_WORKER", 50))
+
+SHARD_PREFIX = "placeholders-"
+SHARD_SUFFIX = ".jsonl"
+
+
+### ************ INPUT DISCOVERY ************
+
+def iter_template_paths(inputs: List[str], manifest: Optional[str] = None) -> Iterator[str]:
+    """
+    Absolute paths of the .docx templates to analyze.
+
+    Args:
+        inputs: Files or directories; directories are walked recursively
+        manifest: Optional file listing one path per line ('-' reads stdin)
+    """
+    candidates = list(inputs)
+    if manifest:
+        with (sys.stdin if manifest == '-' else open(manifest, 'r', encoding='utf-8')) as f:
+            candidates.extend(line.strip() for line in f if line.strip())
+
+    for candidate in candidates:
+        if os.path.isdir(candidate):
+            for root, dirs, files in os.walk(candidate):
+                dirs.sort()
+                for name in sorted(files):
+                    # Word lock files (~$name.docx) are not templates
+                    if name.lower().endswith('.docx') and not name.startswith('~$'):
+                        yield os.path.abspath(os.path.join(root, name))
+        else:
+            yield os.path.abspath(candidate)
+
+
+def file_signature(path: str) -> Tuple[int, int]:
+    """(size in bytes, modification time in ns) identifying one version of a file"""
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+### ************ OUTPUT SHARDS ************
+
+def list_shards(output_dir: str) -> List[str]:
+    """Shard files already in the output directory, in write order"""
+    names = sorted(
+        name for name in os.listdir(output_dir)
+        if name.startswith(SHARD_PREFIX) and name.endswith(SHARD_SUFFIX)
+    )
+    return [os.path.join(output_dir, name) for name in names]
+
+
+def load_completed(output_dir: str, retry_errors: bool = False) -> Dict[str, Tuple[int, int]]:
+    """
+    Templates already analyzed by earlier runs, from the existing shards.
+
+    A crash can leave a truncated last line in a shard; such lines are skipped and
+    their templates analyzed again. Later records for the same path win.
+
+    Returns:
+        Dictionary of path -> (size_bytes, mtime_ns) of the recorded version
+    """
+    completed = {}
+    for shard_path in list_shards(output_dir):
+        with open(shard_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if record.get('status') == 'ok' or not retry_errors:
+                    completed[record['path']] = (record['size_bytes'], record['mtime_ns'])
+                else:
+                    completed.pop(record['path'], None)
+    return completed
+
+
+class ShardWriter:
+    """
+    Append-only JSONL shards of at most shard_records records each.
+
+    Every run starts a new shard after the existing ones, so a shard cut short by a
+    crash is never appended to. Lines are flushed as they are written and each
+    shard is fsynced when it is closed.
+    """
+
+    def __init__(self, output_dir: str, shard_records: int):
+        self.output_dir = output_dir
+        self.shard_records = shard_records
+        self.next_index = len(list_shards(output_dir))
+        self.file = None
+        self.records_in_shard = 0
+
+    def write(self, line: str):
+        if self.file is None or self.records_in_shard >= self.shard_records:
+            self.close()
+            shard_path = os.path.join(self.output_dir, f"{SHARD_PREFIX}{self.next_index:05d}{SHARD_SUFFIX}")
+            self.file = open(shard_path, 'x', encoding='utf-8')
+            self.next_index += 1
+            self.records_in_shard = 0
+        self.file.write(line + '\n')
+        self.file.flush()
+        self.records_in_shard += 1
+
+    def close(self):
+        if self.file is not None:
+            os.fsync(self.file.fileno())
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+### ************ WORKERS ************
+
+# Per-process settings, set by init_worker
+worker_settings: Dict[str, Any] = {}
+
+
+def init_worker(scan_mode: Optional[str], custom_patterns: List[str]):
+    """Process pool initializer: compile the matcher once per worker process"""
+    worker_settings['scan_mode'] = scan_mode
+    worker_settings['matcher'] = get_placeholder_matcher(custom_patterns)
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def analyze_template(task: Tuple[str, int, int]) -> Tuple[str, int, str]:
+    """
+    Analyze one template in a worker process.
+
+    The record is serialized here so only one string per template crosses back
+    to the parent process.
+
+    Returns:
+        Tuple of (status, placeholder count, JSON record line)
+    """
+    path, size_bytes, mtime_ns = task
+    started = time.perf_counter()
+    record = {'path': path, 'size_bytes': size_bytes, 'mtime_ns': mtime_ns}
+    placeholders = []
+    try:
+        if size_bytes > UPLOAD_MAX_BYTES:
+            raise ValueError(f"file exceeds {UPLOAD_MAX_BYTES} bytes")
+        parsed_doc = scan_document(path, mode=worker_settings['scan_mode'], matcher=worker_settings['matcher'])
+        placeholders = collect_placeholder_metadata(path, parsed_doc=parsed_doc)
+        record.update({
+            'status': 'ok',
+            'sha256': file_sha256(path),
+            'scan_mode': parsed_doc['scan_mode'],
+            'total_placeholders': len(placeholders),
+            'unique_placeholders': sorted(set(m['match'] for m in placeholders)),
+            'document_statistics': get_document_statistics(parsed_doc),
+            'placeholders': placeholders,
+        })
+    except Exception as e:
+        record.update({'status': 'error', 'error': f"{type(e).__name__}: {e}"})
+    record['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    return record['status'], len(placeholders), json.dumps(record, ensure_ascii=False)
+
+
+### ************ DRIVER ************
+
+class ProgressReporter:
+    """Periodic progress lines on stderr: done/total, rate, placeholders, errors and ETA"""
+
+    def __init__(self, total: int, interval_seconds: float = 5.0):
+        self.total = total
+        self.interval_seconds = interval_seconds
+        self.started = time.perf_counter()
+        self.last_report = self.started
+        self.done = 0
+        self.errors = 0
+        self.placeholders = 0
+
+    def update(self, status: str, placeholder_count: int):
+        self.done += 1
+        self.errors += status != 'ok'
+        self.placeholders += placeholder_count
+        now = time.perf_counter()
+        if now - self.last_report >= self.interval_seconds or self.done == self.total:
+            self.last_report = now
+            self.report(now)
+
+    def rate(self, now: Optional[float] = None) -> float:
+        elapsed = (now or time.perf_counter()) - self.started
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    def report(self, now: float):
+        rate = self.rate(now)
+        eta = (self.total - self.done) / rate if rate else 0.0
+        print(f"[{self.done}/{self.total}] {rate:.1f} docs/s, {self.placeholders} placeholders, "
+              f"{self.errors} errors, ETA {eta:.0f}s", file=sys.stderr, flush=True)
+
+
+def run_bulk_analysis(paths: List[str], output_dir: str, workers: int, scan_mode: Optional[str] = None,
+                      custom_patterns: Optional[List[str]] = None, retry_errors: bool = False,
+                      shard_records: int = BULK_SHARD_RECORDS,
+                      tasks_per_worker: int = BULK_TASKS_PER_WORKER) -> Dict[str, Any]:
+    """
+    Analyze templates on a process pool, skipping those already in output_dir.
+
+    Args:
+        paths: Template paths (see iter_template_paths)
+        output_dir: Directory holding the JSONL shards; created if missing
+        workers: Worker processes
+        scan_mode: 'light' or 'full'; defaults to DOCX_SCAN_MODE
+        custom_patterns: Extra placeholder patterns, as registered for a tenant
+        retry_errors: Analyze templates whose earlier record is an error again
+        shard_records: Records per shard file
+        tasks_per_worker: Templates per worker process before it is replaced
+
+    Returns:
+        Run summary: counts, elapsed seconds and throughput
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    completed = load_completed(output_dir, retry_errors=retry_errors)
+
+    tasks = []
+    seen: Set[str] = set()
+    missing = 0
+    for path in paths:
+        if path in seen:
+            continue
+        seen.add(path)
+        try:
+            signature = file_signature(path)
+        except OSError:
+            missing += 1
+            print(f"Skipping missing file: {path}", file=sys.stderr)
+            continue
+        if completed.get(path) != signature:
+            tasks.append((path, *signature))
+
+    skipped = len(seen) - missing - len(tasks)
+    print(f"{len(tasks)} templates to analyze, {skipped} already done, {workers} workers", file=sys.stderr)
+
+    progress = ProgressReporter(len(tasks))
+    if tasks:
+        with ShardWriter(output_dir, shard_records) as writer, multiprocessing.Pool(
+            processes=workers,
+            initializer=init_worker,
+            initargs=(scan_mode, list(custom_patterns or [])),
+            maxtasksperchild=tasks_per_worker,
+        ) as pool:
+            for status, placeholder_count, line in pool.imap_unordered(analyze_template, tasks):
+                writer.write(line)
+                progress.update(status, placeholder_count)
+
+    elapsed = time.perf_counter() - progress.started
+    return {
+        'analyzed': progress.done,
+        'errors': progress.errors,
+        'skipped': skipped,
+        'missing': missing,
+        'placeholders': progress.placeholders,
+        'elapsed_seconds': round(elapsed, 2),
+        'docs_per_second': round(progress.rate(), 2),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Analyze a library of .docx templates into sharded JSONL")
+    parser.add_argument('inputs', nargs='*', help=".docx files or directories (searched recursively)")
+    parser.add_argument('--manifest', help="File listing one template path per line ('-' for stdin)")
+    parser.add_argument('--output-dir', required=True, help="Directory for the JSONL shards")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Worker processes (default: CPU count)")
+    parser.add_argument('--scan-mode', choices=['light', 'full'], help="Override DOCX_SCAN_MODE")
+    parser.add_argument('--pattern', action='append', default=[], help="Extra placeholder regex (repeatable)")
+    parser.add_argument('--retry-errors', action='store_true', help="Analyze templates that failed before again")
+    parser.add_argument('--shard-records', type=int, default=BULK_SHARD_RECORDS, help="Records per shard file")
+    args = parser.parse_args(argv)
+
+    if not args.inputs and not args.manifest:
+        parser.error("give template files/directories or --manifest")
+    try:
+        get_placeholder_matcher(args.pattern)
+    except Exception as e:
+        parser.error(f"invalid --pattern: {e}")
+
+    summary = run_bulk_analysis(
+        list(iter_template_paths(args.inputs, args.manifest)),
+        args.output_dir,
+        workers=max(1, args.workers),
+        scan_mode=args.scan_mode,
+        custom_patterns=args.pattern,
+        retry_errors=args.retry_errors,
+        shard_records=args.shard_records,
+    )
+    print(json.dumps(summary))
+    return 1 if summary['errors'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
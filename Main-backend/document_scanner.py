@@ -0,0 +1,1058 @@
+"""
+Placeholder scanning and metadata collection for .docx documents.
+
+Everything needed to find placeholders in a document and describe them, with no
+side effects on import (no LLM client, registry or storage directories), so the
+API server (main.py) and the bulk analysis CLI (bulk_analyze.py) share it.
+"""
+from docx import Document
+from docx.table import Table, _Cell
+from docx.text.paragraph import Paragraph
+from docx.text.run import Run
+from docx.oxml.parser import element_class_lookup, parse_xml
+from docx.oxml.ns import qn
+from docx.styles.styles import Styles
+from docx.enum.style import WD_STYLE_TYPE
+from lxml import etree
+import sys
+import zipfile
+import re
+try:
+    import re._parser as sre_parse
+    import re._constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+import functools
+import itertools
+from bisect import bisect_left, bisect_right
+import os
+from typing import List, Dict, Any, Optional, Tuple
+
+
+# Largest .docx accepted for analysis: bigger uploads are rejected (413) and bulk runs record an error
+UPLOAD_MAX_BYTES = int(os.environ.get("UPLOAD_MAX_BYTES", 50 * 1024 * 1024))
+
+
+### Meta data generation area
+
+# Version of the placeholder records collect_placeholder_metadata (and main's
+# generate_placeholder_metadata) produce. Bump it whenever a change alters the
+# records for the same document (new or renamed fields such as
+# location/match_type, different style resolution, different matching) so cached
+# analyses made by the previous scanner are not reused
+METADATA_SCHEMA_VERSION = 1
+
+# Regex patterns for placeholders
+placeholder_patterns = [
+    r"\[[^\]]+\]",                           # [Client Name]
+    r"\[\[[^\]]+\]\]",                       # [[Client Name]]
+    r"<[^>]+>",                               # <Client Name>
+    r"\{[^}]+\}",                            # {Client Name}
+    r"_{3,}",                                # _____ (3 or more underscores)
+    r"\b[A-Z]+(?:_[A-Z]+)+\b",              # CLIENT_NAME or DATE_OF_SAFE
+    r"\$\{[^}]+\}",                          # ${AMOUNT}
+    r"%[A-Za-z_]+%",                         # %DATE% or %CLIENT_NAME%
+    r"\$[A-Z_]+\$",                          # $CLIENT_NAME$
+    r"\[[A-Z]{2,}\]"                         # [FN], [LN], [DOE]
+]
+
+# Largest character set still worth using as a prefilter trigger
+MATCHER_MAX_TRIGGER_CHARS = 8
+# Compiled matchers kept for distinct custom pattern sets (tenants)
+MATCHER_CACHE_SIZE = int(os.environ.get("MATCHER_CACHE_SIZE", 64))
+
+
+def _literal_chars(op, av) -> Optional[set]:
+    """Characters a single parsed regex item can match, or None if open ended"""
+    if op == sre_constants.LITERAL:
+        return {chr(av)}
+    if op == sre_constants.IN:
+        chars = set()
+        for item_op, item_av in av:
+            if item_op == sre_constants.LITERAL:
+                chars.add(chr(item_av))
+            elif item_op == sre_constants.RANGE and item_av[1] - item_av[0] < 128:
+                chars.update(chr(c) for c in range(item_av[0], item_av[1] + 1))
+            else:
+                return None  # negation, categories (\w, \d) or wide ranges
+        return chars
+    return None
+
+
+@functools.lru_cache(maxsize=1)
+def _cased_chars() -> str:
+    """Every character with a case mapping, the only ones IGNORECASE can equate with another"""
+    return ''.join(c for c in map(chr, range(sys.maxunicode + 1)) if c.lower() != c or c.upper() != c)
+
+
+def _with_case_variants(chars: Optional[set], ignorecase: bool) -> Optional[set]:
+    """
+    chars plus every character an IGNORECASE match treats as one of them.
+    
+    The variants are found by the regex engine itself, so special foldings such
+    as the Kelvin sign for 'k' or dotless i for 'I' are included.
+    """
+    if chars is None or not ignorecase:
+        return chars
+    char_class = ''.join(re.escape(c) for c in sorted(chars))
+    return chars | set(re.findall(f"[{char_class}]", _cased_chars(), re.IGNORECASE))
+
+
+def _scoped_ignorecase(av, ignorecase: bool) -> bool:
+    """Whether a group (?flags:...) matches case-insensitively, given the enclosing setting"""
+    add_flags, del_flags = av[1], av[2]
+    if del_flags & re.IGNORECASE:
+        return False
+    return ignorecase or bool(add_flags & re.IGNORECASE)
+
+
+def _required_chars(items, ignorecase: bool = False) -> Optional[set]:
+    """
+    Smallest character set of which every match of a parsed pattern must contain one.
+    
+    Walks the mandatory items of the sequence (literals, character classes, groups
+    and repeats with a minimum of at least one); None if there is none. Case
+    variants are included wherever the item matches case-insensitively, whether
+    by a global (?i) or a scoped (?i:...) flag.
+    """
+    best = None
+    for op, av in items:
+        if op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT, getattr(sre_constants, 'POSSESSIVE_REPEAT', None)):
+            chars = _required_chars(av[2], ignorecase) if av[0] >= 1 else None
+        elif op == sre_constants.SUBPATTERN:
+            chars = _required_chars(av[-1], _scoped_ignorecase(av, ignorecase))
+        elif op == sre_constants.BRANCH:
+            branches = [_required_chars(branch, ignorecase) for branch in av[1]]
+            chars = set().union(*branches) if all(b is not None for b in branches) else None
+        else:
+            chars = _with_case_variants(_literal_chars(op, av), ignorecase)
+        if chars is not None and (best is None or len(chars) < len(best)):
+            best = chars
+    return best
+
+
+def _first_chars(items, ignorecase: bool = False) -> Optional[set]:
+    """Characters a match of a parsed pattern can start with (case variants included), or None if unknown"""
+    for op, av in items:
+        if op == sre_constants.AT:
+            continue  # anchors and \b consume nothing
+        if op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT, getattr(sre_constants, 'POSSESSIVE_REPEAT', None)):
+            return _first_chars(av[2], ignorecase) if av[0] >= 1 else None
+        if op == sre_constants.SUBPATTERN:
+            return _first_chars(av[-1], _scoped_ignorecase(av, ignorecase))
+        if op == sre_constants.BRANCH:
+            branches = [_first_chars(branch, ignorecase) for branch in av[1]]
+            return set().union(*branches) if all(b is not None for b in branches) else None
+        return _with_case_variants(_literal_chars(op, av), ignorecase)
+    return None
+
+
+# Global inline flags at the start of a pattern, e.g. the (?i) of "(?i)acme"
+GLOBAL_FLAGS_PREFIX = re.compile(r'\(\?([aiLmsux]+)\)')
+
+
+def _union_member(pattern: str) -> str:
+    """
+    A pattern as one alternative of the union regex.
+    
+    Global flags are only allowed at the very start of a regex, so leading ones
+    ("(?i)acme") become a scoped group ("(?i:acme)") with the same meaning.
+    """
+    flags = ''
+    while (prefix := GLOBAL_FLAGS_PREFIX.match(pattern)) is not None:
+        flags += prefix.group(1)
+        pattern = pattern[prefix.end():]
+    # A verbose-mode comment on the last line must not swallow the closing parenthesis
+    return f"(?{flags}:{pattern}\n)" if 'x' in flags else f"(?{flags}:{pattern})"
+
+
+class PlaceholderMatcher:
+    """
+    Placeholder patterns compiled once, with a prefilter and deterministic overlap resolution.
+    
+    - Prefilter: each pattern's trigger characters (one of which every match must
+      contain, e.g. `[` or the `_` of CLIENT_NAME) form a single character class; text
+      without any of them is rejected before a pattern runs.
+    - Overlaps: matches are leftmost-longest. At the leftmost position where any pattern
+      matches, every pattern that can start with that character is tried and the longest
+      match wins, ties going to the pattern listed first ([[Name]] is one placeholder,
+      not "[[Name]"). Scanning resumes after it, so matches never overlap.
+    
+    Build matchers through get_placeholder_matcher so custom pattern sets are compiled
+    once and reused.
+    
+    Raises:
+        re.error: If a pattern is invalid or matches the empty string
+    """
+    
+    def __init__(self, patterns: List[str]):
+        self.patterns = list(patterns)
+        self.compiled = [re.compile(pattern) for pattern in self.patterns]
+        for pattern, compiled in zip(self.patterns, self.compiled):
+            if compiled.match('') is not None:
+                raise re.error("pattern matches the empty string", pattern)
+        self.union = re.compile('|'.join(_union_member(pattern) for pattern in self.patterns))
+        
+        parsed = [
+            (sre_parse.parse(pattern), bool(compiled.flags & re.IGNORECASE))
+            for pattern, compiled in zip(self.patterns, self.compiled)
+        ]
+        self.first_chars = [_first_chars(items, ignorecase) for items, ignorecase in parsed]
+        self._candidates = {}  # first character -> patterns that can match starting with it
+        
+        triggers = set()
+        for items, ignorecase in parsed:
+            required = _required_chars(items, ignorecase)
+            if required is None or len(required) > MATCHER_MAX_TRIGGER_CHARS:
+                triggers = None  # a pattern without triggers can match anywhere
+                break
+            triggers |= required
+        self.triggers = ''.join(sorted(triggers)) if triggers is not None else None
+        self.prefilter = re.compile(f"[{re.escape(self.triggers)}]") if triggers else None
+    
+    def fingerprint(self) -> Dict[str, Any]:
+        """What shapes this matcher's results, for cache keys"""
+        return {'patterns': self.patterns, 'overlaps': 'leftmost-longest'}
+    
+    def could_match(self, text: str) -> bool:
+        """False only if text cannot contain a placeholder"""
+        return self.prefilter is None or self.prefilter.search(text) is not None
+    
+    def candidates(self, char: str) -> Tuple[re.Pattern, ...]:
+        """Compiled patterns, in priority order, whose matches can start with char"""
+        candidates = self._candidates.get(char)
+        if candidates is None:
+            candidates = tuple(
+                compiled for compiled, first_chars in zip(self.compiled, self.first_chars)
+                if first_chars is None or char in first_chars
+            )
+            self._candidates[char] = candidates
+        return candidates
+    
+    def longest_at(self, first):
+        """The longest match starting where the union match first starts, or None if all are empty"""
+        start = first.start()
+        best = first if first.end() > start else None
+        candidates = self.candidates(first.string[start])
+        if best is not None and len(candidates) == 1:
+            return best  # no other pattern can start here
+        for compiled in candidates:
+            candidate = compiled.match(first.string, start)
+            if candidate is not None and candidate.end() > (start if best is None else best.end()):
+                best = candidate
+        return best
+    
+    def search(self, text: str, pos: int = 0):
+        """The first placeholder match at or after pos, or None"""
+        while (first := self.union.search(text, pos)) is not None:
+            best = self.longest_at(first)
+            if best is not None:
+                return best
+            pos = first.start() + 1  # only empty matches here
+        return None
+    
+    def finditer(self, text: str):
+        """Non-overlapping placeholder matches in text, left to right"""
+        if not self.could_match(text):
+            return
+        pos = 0
+        restart = True
+        while restart:
+            restart = False
+            for first in self.union.finditer(text, pos):
+                best = self.longest_at(first)
+                if best is None:
+                    continue
+                yield best
+                pos = max(best.end(), best.start() + 1)  # always move past the match, even an empty one
+                if best is not first:
+                    # A longer match than the union's: the union scan went on from
+                    # inside it, so continue from its end instead
+                    restart = True
+                    break
+
+
+@functools.lru_cache(maxsize=MATCHER_CACHE_SIZE)
+def _compile_matcher(patterns: Tuple[str, ...]) -> PlaceholderMatcher:
+    return PlaceholderMatcher(list(patterns))
+
+
+def get_placeholder_matcher(custom_patterns: Optional[List[str]] = None) -> PlaceholderMatcher:
+    """
+    Matcher for the built-in placeholder patterns plus optional custom ones.
+    
+    Custom patterns (e.g. a tenant's) rank after the built-in ones on ties. Each
+    distinct pattern set is compiled once and cached.
+    
+    Raises:
+        re.error: If a custom pattern is not a valid regular expression or matches the empty string
+    """
+    return _compile_matcher(tuple(placeholder_patterns) + tuple(custom_patterns or ()))
+
+
+placeholder_matcher = get_placeholder_matcher()
+
+# Sentence splitting regex
+sentence_endings = re.compile(r'[.!?]+[\s\n]+|[\n]{2,}')
+
+def extract_sentences(text):
+    """Extract sentences from text, preserving their positions"""
+    sentences = []
+    start = 0
+    
+    for match in sentence_endings.finditer(text):
+        end = match.end()
+        sentence = text[start:end].strip()
+        if sentence:
+            sentences.append({
+                'text': sentence,
+                'start': start,
+                'end': end
+            })
+        start = end
+    
+    # Add last sentence if text doesn't end with sentence ending
+    if start < len(text):
+        sentence = text[start:].strip()
+        if sentence:
+            sentences.append({
+                'text': sentence,
+                'start': start,
+                'end': len(text)
+            })
+    
+    return sentences
+
+def find_sentence_context(sentences, match_pos, match_length, sentence_starts=None):
+    """
+    Find the sentence containing the match and the sentences before/after.
+    
+    Sentences are ordered and never overlap, so the only candidate is the last
+    sentence starting at or before match_pos. Pass precomputed sentence_starts
+    to avoid rebuilding them for every match in the same paragraph.
+    """
+    sentence_before = None
+    sentence_with_match = None
+    sentence_after = None
+    
+    if sentence_starts is None:
+        sentence_starts = [sent['start'] for sent in sentences]
+    
+    i = bisect_right(sentence_starts, match_pos) - 1
+    if i >= 0 and match_pos < sentences[i]['end']:
+        sentence_with_match = sentences[i]['text']
+        if i > 0:
+            sentence_before = sentences[i-1]['text']
+        if i < len(sentences) - 1:
+            sentence_after = sentences[i+1]['text']
+    
+    return sentence_before, sentence_with_match, sentence_after
+
+def estimate_page_number(paragraph_index, total_paragraphs, avg_paragraphs_per_page=20):
+    """
+    Estimate page number based on paragraph position.
+    Note: This is an approximation. Actual page numbers depend on:
+    - Font sizes, margins, spacing
+    - Images, tables, headers, footers
+    - Word's rendering engine
+    
+    For accurate page numbers, you'd need to:
+    1. Use COM automation (win32com on Windows)
+    2. Convert to PDF and extract page info
+    3. Use Aspose.Words or similar library
+    """
+    return min(int(paragraph_index / avg_paragraphs_per_page) + 1, max(1, total_paragraphs // avg_paragraphs_per_page))
+
+def build_paragraph_index(paragraph):
+    """Index a paragraph once: joined text, run handles and run end offsets"""
+    runs = paragraph.runs
+    run_texts = [run.text for run in runs]
+    
+    # run_ends[i] is the character offset where run i stops in the paragraph text
+    run_ends = []
+    char_pos = 0
+    for text in run_texts:
+        char_pos += len(text)
+        run_ends.append(char_pos)
+    
+    return {
+        'paragraph': paragraph,  # Handle for lazy style/alignment lookups
+        'runs': runs,
+        'run_texts': run_texts,
+        'run_ends': run_ends,
+        'text': ''.join(run_texts),
+    }
+
+
+def build_table_cell_index(table) -> Dict[str, Any]:
+    """
+    Index a table's physical cells once.
+    
+    `row.cells` re-resolves horizontal and vertical merges on every access, so a cell
+    is addressed by its position among the table's <w:tc> elements instead. Those
+    positions are stable for every copy of the same document.
+    """
+    tcs = list(table._tbl.iter_tcs())
+    return {
+        'table': table,
+        'tcs': tcs,
+        'positions': {tc: position for position, tc in enumerate(tcs)},
+        'rows': None,  # table.rows as a list, built on first use
+        'row_cells': {},  # row_index -> row.cells, resolved on first use
+    }
+
+
+def get_table_cell(table_entry: Dict[str, Any], cell_position: int):
+    """Cell object for the physical cell at cell_position"""
+    return _Cell(table_entry['tcs'][cell_position], table_entry['table'])
+
+
+def iter_table_cells(table, paragraph_entry=build_paragraph_index):
+    """
+    Yield (row_idx, cell_idx, cell_position, paragraph entries) for each grid slot of a table.
+    
+    Like row.cells, a merged cell is yielded once per grid slot it spans; its
+    paragraphs are indexed only the first time.
+    """
+    table_entry = build_table_cell_index(table)
+    cell_paragraphs: Dict[int, List[Dict[str, Any]]] = {}
+    for row_idx, row in enumerate(table.rows):
+        for cell_idx, cell in enumerate(row.cells):
+            cell_position = table_entry['positions'][cell._tc]
+            if cell_position not in cell_paragraphs:
+                cell_paragraphs[cell_position] = [paragraph_entry(p) for p in cell.paragraphs]
+            yield row_idx, cell_idx, cell_position, cell_paragraphs[cell_position]
+
+
+def get_table_cells(table):
+    """Grid slots of a table from either scan mode (see iter_table_cells)"""
+    return table['cells'] if isinstance(table, dict) else iter_table_cells(table)
+
+
+def build_document_index(doc):
+    """
+    Walk the document body once and build a compact paragraph index.
+    
+    `doc.paragraphs` rebuilds its list on every access, so it is read exactly once
+    here and every later paragraph, sentence or run lookup goes through the index.
+    """
+    paragraphs = [build_paragraph_index(paragraph) for paragraph in doc.paragraphs]
+    
+    return {
+        'doc': doc,
+        'paragraphs': paragraphs,
+        'tables': doc.tables,
+        'non_empty_paragraphs': sum(1 for p in paragraphs if p['text'].strip()),
+        'matcher': placeholder_matcher,
+        # Style names resolved once per style id, not once per paragraph
+        'styles': LightStyles(doc.styles),
+    }
+
+
+def parse_document(doc_path, matcher: Optional[PlaceholderMatcher] = None):
+    """
+    Parse a .docx file once and return its document index.
+    
+    The returned parsed document is shared by metadata collection, summary
+    statistics, context generation and the chat functions so a single request
+    never opens the same file twice.
+    """
+    parsed_doc = build_document_index(Document(doc_path))
+    parsed_doc['path'] = doc_path
+    parsed_doc['matcher'] = matcher or placeholder_matcher
+    parsed_doc['scan_mode'] = 'full'
+    return parsed_doc
+
+
+# 'light' scans word/document.xml incrementally instead of loading the whole
+# package (images included) into the python-docx object model; 'full' always
+# uses python-docx. The light scan falls back to the full one on any error.
+DOCX_SCAN_MODE = os.environ.get("DOCX_SCAN_MODE", "light").lower()
+
+OFFICE_DOCUMENT_REL = 'officeDocument'
+STYLES_REL = 'styles'
+# Relationship types of the main document part that hold other stories, in scan
+# order, with the story name recorded in placeholder locations
+STORY_PART_RELS = (('header', 'header'), ('footer', 'footer'), ('footnotes', 'footnote'), ('endnotes', 'endnote'))
+
+PARAGRAPH_TAG = qn('w:p')
+TABLE_TAG = qn('w:tbl')
+CELL_TAG = qn('w:tc')
+RUN_TAG = qn('w:r')
+TEXT_BOX_TAG = qn('w:txbxContent')
+# VML copy of a text box that Word writes next to the DrawingML one
+CHOICE_TAG = '{http://schemas.openxmlformats.org/markup-compatibility/2006}Choice'
+FALLBACK_TAG = '{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback'
+# Elements whose children are the top-level blocks of a story, and the block types
+STORY_CONTAINER_TAGS = frozenset(qn(tag) for tag in ('w:body', 'w:hdr', 'w:ftr', 'w:footnote', 'w:endnote'))
+STORY_BLOCK_TAGS = (PARAGRAPH_TAG, TABLE_TAG, qn('w:sdt'))
+# Run children that contribute to Run.text
+RUN_TEXT_TAGS = frozenset(qn(tag) for tag in ('w:br', 'w:cr', 'w:noBreakHyphen', 'w:ptab', 'w:t', 'w:tab'))
+
+
+def read_package_relationships(archive: zipfile.ZipFile, rels_path: str) -> List[Tuple[str, str]]:
+    """(relationship type (last path segment), target) pairs of one .rels part, empty if absent"""
+    try:
+        rels = etree.fromstring(archive.read(rels_path))
+    except KeyError:
+        return []
+    return [(rel.get('Type', '').rsplit('/', 1)[-1], rel.get('Target', '')) for rel in rels
+            if rel.get('TargetMode') != 'External']
+
+
+def resolve_part_name(base_dir: str, target: str) -> str:
+    """Zip member name of a relationship target relative to base_dir"""
+    if target.startswith('/'):
+        return target.lstrip('/')
+    return os.path.normpath(os.path.join(base_dir, target)).replace(os.sep, '/')
+
+
+def order_story_parts(part_rels: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """
+    (part name, story) for each distinct story part, headers first, then footers,
+    footnotes and endnotes, each in part-name order (header2 before header10)
+    """
+    stories = dict(STORY_PART_RELS)
+    parts = {name: stories[rel_type] for rel_type, name in part_rels if rel_type in stories}
+    story_order = [story for _, story in STORY_PART_RELS]
+    return sorted(parts.items(), key=lambda item: (story_order.index(item[1]), len(item[0]), item[0]))
+
+
+class LightStyles:
+    """Paragraph style and alignment lookups without a document part, resolved like python-docx does"""
+    
+    def __init__(self, styles: Optional[Styles]):
+        self.styles = styles
+        self._names: Dict[Optional[str], Optional[str]] = {}
+    
+    @classmethod
+    def from_xml(cls, styles_xml: Optional[bytes]) -> "LightStyles":
+        return cls(Styles(parse_xml(styles_xml)) if styles_xml else None)
+    
+    def style_name(self, style_id: Optional[str]) -> Optional[str]:
+        if style_id not in self._names:
+            style = self.styles.get_by_id(style_id, WD_STYLE_TYPE.PARAGRAPH) if self.styles else None
+            self._names[style_id] = style.name if style else None
+        return self._names[style_id]
+    
+    def style_info(self, paragraph) -> Dict[str, Any]:
+        # Same shape and values as get_paragraph_style_info
+        return {
+            'alignment': str(paragraph.alignment) if paragraph.alignment else None,
+            'style': self.style_name(paragraph._p.style),
+        }
+
+
+def build_light_paragraph_index(p_element, styles: LightStyles,
+                                matcher: Optional[PlaceholderMatcher] = None) -> Dict[str, Any]:
+    """
+    build_paragraph_index for a bare paragraph element.
+    
+    Run text is read straight from the run children (the same elements Run.text
+    joins, without an XPath query per run), style info is resolved up front, and
+    run handles are only kept for paragraphs that contain a placeholder
+    (get_run_information is the only reader), so the index holds text, not the XML tree.
+    """
+    run_elements = [child for child in p_element if child.tag == RUN_TAG]
+    run_texts = [
+        ''.join(str(child) for child in r if child.tag in RUN_TEXT_TAGS)
+        for r in run_elements
+    ]
+    text = ''.join(run_texts)
+    paragraph = Paragraph(p_element, None)
+    has_placeholder = (matcher or placeholder_matcher).search(text) is not None
+    
+    return {
+        'paragraph': None,
+        'runs': [Run(r, paragraph) for r in run_elements] if has_placeholder else [],
+        'run_texts': run_texts,
+        'run_ends': list(itertools.accumulate(len(run_text) for run_text in run_texts)),
+        'text': text,
+        'style_info': styles.style_info(paragraph),
+    }
+
+
+def iter_story_blocks(xml_file):
+    """
+    Stream the top-level blocks (paragraphs, tables, content controls) of every story in a part.
+    
+    Each block is yielded once it is complete, then cleared and detached, so the
+    parsed tree never holds more than the block being read.
+    """
+    events = etree.iterparse(xml_file, events=('end',), tag=STORY_BLOCK_TAGS, remove_blank_text=True,
+                             resolve_entities=False, huge_tree=True)
+    events.set_element_class_lookup(element_class_lookup)
+    for _, element in events:
+        parent = element.getparent()
+        # Blocks nested in a table, content control or text box are read with their top-level block
+        if parent is None or parent.tag not in STORY_CONTAINER_TAGS:
+            continue
+        yield element
+        element.clear()
+        parent.remove(element)
+
+
+def iter_element_story_blocks(root):
+    """iter_story_blocks for a part that is already parsed"""
+    for container in root.iter(*STORY_CONTAINER_TAGS):
+        for child in container:
+            if child.tag in STORY_BLOCK_TAGS:
+                yield child
+
+
+def is_body_indexed_paragraph(p_element, block) -> bool:
+    """Whether the main body index already covers this paragraph (doc.paragraphs / top-level table cells)"""
+    if p_element is block:
+        return True
+    cell = p_element.getparent()
+    return (block.tag == TABLE_TAG and cell.tag == CELL_TAG
+            and cell.getparent().getparent() is block)
+
+
+def index_story_block(block, block_index: int, part_name: str, story: str,
+                      styles: LightStyles, matcher: Optional[PlaceholderMatcher] = None) -> List[Dict[str, Any]]:
+    """
+    Index the paragraphs of one story block that hold placeholders.
+    
+    In the main body, paragraphs already covered by the paragraph and table index are
+    skipped, leaving text boxes, nested tables and content controls. Every entry gets
+    the location descriptor the filler resolves (see FillTargets).
+    """
+    story_paragraphs = []
+    for para_idx_in_block, p_element in enumerate(block.iter(PARAGRAPH_TAG)):
+        if story == 'body' and is_body_indexed_paragraph(p_element, block):
+            continue
+        
+        in_text_box = False
+        table_depth = 0
+        in_fallback = False
+        for ancestor in itertools.chain([p_element], p_element.iterancestors()):
+            if ancestor.tag == TEXT_BOX_TAG:
+                in_text_box = True
+            elif ancestor.tag == TABLE_TAG:
+                table_depth += 1
+            elif ancestor.tag == FALLBACK_TAG:
+                in_fallback = True
+            if ancestor is block:
+                break
+        if in_fallback:
+            continue
+        
+        para_entry = build_light_paragraph_index(p_element, styles, matcher)
+        if not para_entry['runs']:
+            continue
+        
+        if in_text_box:
+            match_type = 'text_box'
+        elif story == 'body':
+            match_type = 'nested_table' if table_depth > 1 else 'content_control'
+        else:
+            match_type = story
+        
+        story_paragraphs.append({
+            'para_entry': para_entry,
+            'match_type': match_type,
+            'location': {
+                'part': part_name,
+                'story': story,
+                'block_index': block_index,
+                'paragraph_index_in_block': para_idx_in_block,
+                'in_text_box': in_text_box,
+                'table_depth': table_depth,
+            },
+        })
+    return story_paragraphs
+
+
+def build_story_index(doc, matcher: Optional[PlaceholderMatcher] = None) -> List[Dict[str, Any]]:
+    """
+    Story paragraphs with placeholders (see index_story_block) of a document already
+    loaded by python-docx, read from the parts it holds in memory.
+    """
+    styles = LightStyles(doc.styles)
+    document_part = doc.part
+    story_paragraphs = []
+    for block_index, block in enumerate(iter_element_story_blocks(doc.element)):
+        story_paragraphs.extend(index_story_block(
+            block, block_index, str(document_part.partname).lstrip('/'), 'body', styles, matcher
+        ))
+    
+    parts = {}
+    part_rels = []
+    for rel in document_part.rels.values():
+        if not rel.is_external:
+            part_name = str(rel.target_part.partname).lstrip('/')
+            parts[part_name] = rel.target_part
+            part_rels.append((rel.reltype.rsplit('/', 1)[-1], part_name))
+    
+    for part_name, story in order_story_parts(part_rels):
+        root = get_story_part_element(parts[part_name])
+        for block_index, block in enumerate(iter_element_story_blocks(root)):
+            story_paragraphs.extend(index_story_block(block, block_index, part_name, story, styles, matcher))
+    return story_paragraphs
+
+
+def get_story_part_element(part):
+    """
+    Root element of a story part.
+    
+    python-docx models headers and footers as XML parts; footnotes and endnotes are
+    plain blob parts and are parsed here.
+    """
+    element = getattr(part, 'element', None)
+    return element if element is not None else parse_xml(part.blob)
+
+
+def get_story_paragraphs(doc_index) -> List[Dict[str, Any]]:
+    """Story paragraphs of a document index, built from the loaded document on first use"""
+    if doc_index.get('stories') is None:
+        doc_index['stories'] = build_story_index(doc_index['doc'], doc_index.get('matcher'))
+    return doc_index['stories']
+
+
+def parse_document_light(doc_path, matcher: Optional[PlaceholderMatcher] = None):
+    """
+    Build the same document index as parse_document from the package XML alone.
+    
+    word/document.xml and every header, footer, footnotes and endnotes part are
+    read incrementally, in a single pass each; no other part except the styles is
+    loaded, so memory stays proportional to the document text rather than to the
+    file (embedded images, fonts) or its full object model.
+    """
+    matcher = matcher or placeholder_matcher
+    with zipfile.ZipFile(doc_path) as archive:
+        package_rels = dict(read_package_relationships(archive, '_rels/.rels'))
+        document_part = resolve_part_name('', package_rels.get(OFFICE_DOCUMENT_REL, 'word/document.xml'))
+        document_dir, document_name = os.path.split(document_part)
+        document_rels = [
+            (rel_type, resolve_part_name(document_dir, target))
+            for rel_type, target in read_package_relationships(
+                archive, '/'.join(filter(None, [document_dir, '_rels', document_name + '.rels']))
+            )
+        ]
+        styles_part = dict(document_rels).get(STYLES_REL)
+        styles = LightStyles.from_xml(archive.read(styles_part) if styles_part else None)
+        
+        paragraphs = []
+        tables = []
+        stories = []
+        with archive.open(document_part) as xml_file:
+            for block_index, element in enumerate(iter_story_blocks(xml_file)):
+                stories.extend(index_story_block(element, block_index, document_part, 'body', styles, matcher))
+                if element.tag == PARAGRAPH_TAG:
+                    paragraphs.append(build_light_paragraph_index(element, styles, matcher))
+                elif element.tag == TABLE_TAG:
+                    cells = iter_table_cells(
+                        Table(element, None), lambda paragraph: build_light_paragraph_index(paragraph._p, styles, matcher)
+                    )
+                    tables.append({'cells': list(cells)})
+        
+        for part_name, story in order_story_parts(document_rels):
+            with archive.open(part_name) as xml_file:
+                for block_index, element in enumerate(iter_story_blocks(xml_file)):
+                    stories.extend(index_story_block(element, block_index, part_name, story, styles, matcher))
+    
+    return {
+        'doc': None,
+        'paragraphs': paragraphs,
+        'tables': tables,
+        'stories': stories,
+        'non_empty_paragraphs': sum(1 for p in paragraphs if p['text'].strip()),
+        'path': doc_path,
+        'scan_mode': 'light',
+        'matcher': matcher,
+    }
+
+
+def scan_document(doc_path, mode: Optional[str] = None, matcher: Optional[PlaceholderMatcher] = None):
+    """
+    Parse a .docx file for analysis in the configured scan mode (DOCX_SCAN_MODE).
+    
+    Args:
+        doc_path: Path to the .docx file
+        mode: 'light' or 'full'; defaults to DOCX_SCAN_MODE
+        matcher: Placeholder matcher to scan with; defaults to placeholder_matcher
+    
+    Returns:
+        Document index as returned by parse_document; 'scan_mode' says which scan produced it
+    """
+    if (mode or DOCX_SCAN_MODE) == 'light':
+        try:
+            return parse_document_light(doc_path, matcher)
+        except Exception as e:
+            print(f"Light scan failed for {doc_path}, falling back to full parse: {e}")
+    return parse_document(doc_path, matcher)
+
+
+def get_document_statistics(parsed_doc):
+    """Summary statistics for a parsed document"""
+    total_paragraphs = parsed_doc['non_empty_paragraphs']
+    return {
+        'total_paragraphs': total_paragraphs,
+        'total_tables': len(parsed_doc['tables']),
+        'estimated_total_pages': estimate_page_number(total_paragraphs, total_paragraphs)
+    }
+
+
+def get_document_text_paragraphs(parsed_doc):
+    """Non-empty paragraph texts of a parsed document, in order"""
+    return [p['text'] for p in parsed_doc['paragraphs'] if p['text'].strip()]
+
+
+
+def get_paragraph_sentences(para_entry):
+    """Split an indexed paragraph into sentences once and keep their start offsets"""
+    if 'sentences' not in para_entry:
+        sentences = extract_sentences(para_entry['text'])
+        para_entry['sentences'] = sentences
+        para_entry['sentence_starts'] = [sent['start'] for sent in sentences]
+    return para_entry['sentences'], para_entry['sentence_starts']
+
+
+def get_indexed_paragraph_context(doc_index, para_idx):
+    """Get the stripped text of the paragraphs around para_idx from the index"""
+    paragraphs = doc_index['paragraphs']
+    context_before = paragraphs[para_idx - 1]['text'].strip() if para_idx > 0 else ""
+    context_after = paragraphs[para_idx + 1]['text'].strip() if para_idx < len(paragraphs) - 1 else ""
+    return context_before, context_after
+
+
+def get_paragraph_style_info(para_entry, styles: Optional[LightStyles] = None):
+    """
+    Resolve paragraph alignment and style name once per indexed paragraph.
+    
+    With the document's LightStyles the style name comes from its per-id cache;
+    python-docx's own lookup scans every style for the default on each call.
+    """
+    if 'style_info' not in para_entry:
+        paragraph = para_entry['paragraph']
+        if styles is not None:
+            para_entry['style_info'] = styles.style_info(paragraph)
+        else:
+            para_entry['style_info'] = {
+                'alignment': str(paragraph.alignment) if paragraph.alignment else None,
+                'style': paragraph.style.name if paragraph.style else None,
+            }
+    return para_entry['style_info']
+
+
+def get_run_information(para_entry, match_start, match_end):
+    """
+    Describe the runs where a match starts and ends.
+    
+    Binary search over the run end offsets: the run holding match_start is the
+    first one ending after it, the run holding the last matched character is the
+    first one ending at or after match_end. Empty runs can never hold either.
+    """
+    run_ends = para_entry['run_ends']
+    start_run = bisect_right(run_ends, match_start)
+    end_run = bisect_left(run_ends, match_end)
+    
+    run_indices = [start_run] if start_run == end_run else [start_run, end_run]
+    
+    run_info = []
+    for run_idx in run_indices:
+        run = para_entry['runs'][run_idx]
+        run_info.append({
+            'run_index': run_idx,
+            'text': para_entry['run_texts'][run_idx],
+            'bold': run.bold,
+            'italic': run.italic,
+            'underline': run.underline,
+            'font_name': run.font.name if run.font and run.font.name else None,
+            'font_size': str(run.font.size) if run.font and run.font.size else None,
+        })
+    return run_info
+
+
+def collect_placeholder_metadata(doc_path, parsed_doc=None):
+    """
+    Collect comprehensive metadata for all placeholders in document.
+    
+    Pass parsed_doc (from parse_document) to reuse an already parsed file.
+    """
+    doc_index = parsed_doc if parsed_doc is not None else parse_document(doc_path)
+    matcher = doc_index.get('matcher') or placeholder_matcher
+    styles = doc_index.get('styles')
+    all_metadata = []
+    placeholder_counter = 0  # Counter for unique IDs
+    
+    # Calculate total paragraphs for page estimation
+    total_paragraphs = doc_index['non_empty_paragraphs']
+    
+    # Process paragraphs
+    for para_idx, para_entry in enumerate(doc_index['paragraphs']):
+        full_text = para_entry['text']
+        
+        if not full_text.strip():
+            continue
+        
+        sentences, sentence_starts = get_paragraph_sentences(para_entry)
+        
+        # Paragraph context is the same for every match in this paragraph
+        para_context_before, para_context_after = get_indexed_paragraph_context(doc_index, para_idx)
+        
+        # Find all matches with their positions
+        for match in matcher.finditer(full_text):
+            match_text = match.group()
+            match_start = match.start()
+            match_end = match.end()
+            
+            # Get sentence context
+            sentence_before, sentence_with_match, sentence_after = find_sentence_context(
+                sentences, match_start, len(match_text), sentence_starts
+            )
+            
+            # Extract surrounding text (100 chars before and after)
+            context_start = max(0, match_start - 100)
+            context_end = min(len(full_text), match_end + 100)
+            surrounding_text = full_text[context_start:context_end]
+            match_position_in_context = match_start - context_start
+            
+            # Get run information
+            run_info = get_run_information(para_entry, match_start, match_end)
+            
+            # Estimate page number
+            estimated_page = estimate_page_number(para_idx, total_paragraphs)
+            
+            # Generate unique ID
+            placeholder_counter += 1
+            unique_id = f"PLACEHOLDER_{placeholder_counter:04d}"
+            
+            style_info = get_paragraph_style_info(para_entry, styles)
+            
+            metadata = {
+                'unique_id': unique_id,
+                'match': match_text,
+                'match_type': 'paragraph',
+                'paragraph_index': para_idx,
+                'estimated_page_number': estimated_page,
+                'note_about_page': 'Page number is estimated. Actual pages depend on Word rendering.',
+                'position_in_paragraph': match_start,
+                'position_in_document': None,  # Can be calculated if needed
+                'sentence_before': sentence_before,
+                'sentence_with_match': sentence_with_match,
+                'sentence_after': sentence_after,
+                'paragraph_context_before': para_context_before[:200] if para_context_before else None,
+                'paragraph_context_after': para_context_after[:200] if para_context_after else None,
+                'surrounding_text': surrounding_text,
+                'match_position_in_context': match_position_in_context,
+                'run_information': run_info,
+                'paragraph_alignment': style_info['alignment'],
+                'paragraph_style': style_info['style'],
+                'full_paragraph_text': full_text[:500],  # First 500 chars
+                'paragraph_length': len(full_text),
+                # LLM and filling fields
+                'llm_context': None,  # Will be populated by LLM with context about what to fill
+                'is_filled': False,  # Whether this placeholder has been filled
+                'value': None,  # The value that will replace the placeholder
+            }
+            
+            all_metadata.append(metadata)
+    
+    # Process tables
+    for table_idx, table in enumerate(doc_index['tables']):
+        for row_idx, cell_idx, cell_position, cell_paragraphs in get_table_cells(table):
+            for para_idx_in_cell, para_entry in enumerate(cell_paragraphs):
+                full_text = para_entry['text']
+                
+                if not full_text.strip():
+                    continue
+                
+                sentences, sentence_starts = get_paragraph_sentences(para_entry)
+                
+                for match in matcher.finditer(full_text):
+                    match_text = match.group()
+                    match_start = match.start()
+                    match_end = match.end()
+                    
+                    sentence_before, sentence_with_match, sentence_after = find_sentence_context(
+                        sentences, match_start, len(match_text), sentence_starts
+                    )
+                    
+                    context_start = max(0, match_start - 100)
+                    context_end = min(len(full_text), match_end + 100)
+                    surrounding_text = full_text[context_start:context_end]
+                    match_position_in_context = match_start - context_start
+                    
+                    run_info = get_run_information(para_entry, match_start, match_end)
+                    
+                    # Generate unique ID for table placeholders too
+                    placeholder_counter += 1
+                    unique_id = f"PLACEHOLDER_{placeholder_counter:04d}"
+                    
+                    metadata = {
+                        'unique_id': unique_id,
+                        'match': match_text,
+                        'match_type': 'table',
+                        'table_index': table_idx,
+                        'row_index': row_idx,
+                        'cell_index': cell_idx,
+                        'cell_position': cell_position,  # Physical cell address, see build_table_cell_index
+                        'paragraph_index_in_cell': para_idx_in_cell,
+                        'position_in_paragraph': match_start,
+                        'sentence_before': sentence_before,
+                        'sentence_with_match': sentence_with_match,
+                        'sentence_after': sentence_after,
+                        'surrounding_text': surrounding_text,
+                        'match_position_in_context': match_position_in_context,
+                        'run_information': run_info,
+                        'paragraph_style': get_paragraph_style_info(para_entry, styles)['style'],
+                        'full_paragraph_text': full_text[:500],
+                        # LLM and filling fields
+                        'llm_context': None,  # Will be populated by LLM with context about what to fill
+                        'is_filled': False,  # Whether this placeholder has been filled
+                        'value': None,  # The value that will replace the placeholder
+                    }
+                    
+                    all_metadata.append(metadata)
+    
+    # Process headers, footers, footnotes, text boxes, nested tables and content controls
+    for story_paragraph in get_story_paragraphs(doc_index):
+        para_entry = story_paragraph['para_entry']
+        full_text = para_entry['text']
+        sentences, sentence_starts = get_paragraph_sentences(para_entry)
+        
+        for match in matcher.finditer(full_text):
+            match_text = match.group()
+            match_start = match.start()
+            match_end = match.end()
+            
+            sentence_before, sentence_with_match, sentence_after = find_sentence_context(
+                sentences, match_start, len(match_text), sentence_starts
+            )
+            
+            context_start = max(0, match_start - 100)
+            context_end = min(len(full_text), match_end + 100)
+            surrounding_text = full_text[context_start:context_end]
+            match_position_in_context = match_start - context_start
+            
+            run_info = get_run_information(para_entry, match_start, match_end)
+            
+            placeholder_counter += 1
+            unique_id = f"PLACEHOLDER_{placeholder_counter:04d}"
+            
+            metadata = {
+                'unique_id': unique_id,
+                'match': match_text,
+                'match_type': story_paragraph['match_type'],
+                'location': story_paragraph['location'],  # Resolved by FillTargets
+                'position_in_paragraph': match_start,
+                'sentence_before': sentence_before,
+                'sentence_with_match': sentence_with_match,
+                'sentence_after': sentence_after,
+                'surrounding_text': surrounding_text,
+                'match_position_in_context': match_position_in_context,
+                'run_information': run_info,
+                'paragraph_style': get_paragraph_style_info(para_entry, styles)['style'],
+                'full_paragraph_text': full_text[:500],
+                # LLM and filling fields
+                'llm_context': None,  # Will be populated by LLM with context about what to fill
+                'is_filled': False,  # Whether this placeholder has been filled
+                'value': None,  # The value that will replace the placeholder
+            }
+            
+            all_metadata.append(metadata)
+    
+    return all_metadata